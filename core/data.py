@@ -1,21 +1,52 @@
 import hashlib
 from asyncio import Task
-from dataclasses import dataclass, field
+from collections.abc import Callable
 from datetime import datetime
-from pathlib import Path
+from pathlib import Path, PosixPath, WindowsPath
 from typing import Any, TypedDict
 
+from msgspec import Struct, field
+
+try:
+    from blake3 import blake3 as _rid_hasher
+
+    def _rid_hexdigest(h) -> str:
+        return h.hexdigest(length=8)
+
+except ImportError:  # 未安装 blake3 时回退到标准库 blake2b
+
+    def _rid_hasher():
+        return hashlib.blake2b(digest_size=8)
+
+    def _rid_hexdigest(h) -> str:
+        return h.hexdigest()
+
+
+def _repr_path(path: Path) -> str:
+    return f"path={path.name}"
+
+
+def _repr_task(task: Task[Path]) -> str:
+    return f"task={task.get_name()}, done={task.done()}"
+
+
+_REPR_BY_TYPE: dict[type, Callable[[Any], str]] = {
+    PosixPath: _repr_path,
+    WindowsPath: _repr_path,
+    Task: _repr_task,
+}
+
 
 def repr_path_task(path_task: Path | Task[Path]) -> str:
-    if isinstance(path_task, Path):
-        return f"path={path_task.name}"
-    else:
-        return f"task={path_task.get_name()}, done={path_task.done()}"
+    fn = _REPR_BY_TYPE.get(type(path_task))
+    if fn is None:  # 自定义 Path / Task 子类, 回退到 isinstance 判断
+        fn = _repr_path if isinstance(path_task, Path) else _repr_task
+    return fn(path_task)
 
 
-@dataclass(repr=False, slots=True)
-class MediaContent:
+class MediaContent(Struct):
     path_task: Path | Task[Path]
+    """本地路径或已调度的下载任务, 不会是裸协程, 调用方可直接并发 await"""
 
     async def get_path(self) -> Path:
         if isinstance(self.path_task, Path):
@@ -28,14 +59,12 @@ class MediaContent:
         return f"{prefix}({repr_path_task(self.path_task)})"
 
 
-@dataclass(repr=False, slots=True)
 class AudioContent(MediaContent):
     """音频内容"""
 
     duration: float = 0.0
 
 
-@dataclass(repr=False, slots=True)
 class FileContent(MediaContent):
     """文件内容"""
 
@@ -43,7 +72,6 @@ class FileContent(MediaContent):
     """文件名"""
 
 
-@dataclass(repr=False, slots=True)
 class VideoContent(MediaContent):
     """视频内容"""
 
@@ -73,21 +101,18 @@ class VideoContent(MediaContent):
         return repr + ")"
 
 
-@dataclass(repr=False, slots=True)
 class ImageContent(MediaContent):
     """图片内容"""
 
     pass
 
 
-@dataclass(repr=False, slots=True)
 class DynamicContent(MediaContent):
     """动态内容 视频格式 后续转 gif"""
 
     gif_path: Path | None = None
 
 
-@dataclass(repr=False, slots=True)
 class GraphicsContent(MediaContent):
     """图文内容 渲染时文字在前 图片在后"""
 
@@ -105,8 +130,20 @@ class GraphicsContent(MediaContent):
         return repr + ")"
 
 
-@dataclass(slots=True)
-class Platform:
+# 各内容类型参与资源指纹计算的附加字段, 按具体类型精确分发
+_RID_EXTRACTORS: dict[type[MediaContent], Callable[[Any], tuple[object, ...]]] = {
+    VideoContent: lambda c: (c.duration,),
+    AudioContent: lambda c: (c.duration,),
+    FileContent: lambda c: (c.name,),
+    GraphicsContent: lambda c: (c.text, c.alt),
+}
+
+
+def _rid_no_extra(_: MediaContent) -> tuple[object, ...]:
+    return ()
+
+
+class Platform(Struct):
     """平台信息"""
 
     name: str
@@ -115,8 +152,7 @@ class Platform:
     """ 平台显示名称 """
 
 
-@dataclass(repr=False, slots=True)
-class Author:
+class Author(Struct):
     """作者信息"""
 
     name: str
@@ -143,8 +179,7 @@ class Author:
         return repr + ")"
 
 
-@dataclass(repr=False, slots=True)
-class ParseResult:
+class ParseResult(Struct):
     """完整的解析结果"""
 
     platform: Platform
@@ -167,8 +202,33 @@ class ParseResult:
     """转发的内容"""
     render_image: Path | None = None
     """渲染图片"""
-    _resource_id: str | None = field(default=None, init=False, repr=False)
+    _resource_id: str | None = None
     """资源 ID"""
+    _buckets: dict[type[MediaContent], list[Any]] | None = None
+    """按类型分桶的媒体内容"""
+    _formatted_dt: str | None = None
+    """格式化后的发布时间"""
+    _display_url: str | None = None
+    """链接展示文本"""
+    _repost_display_url: str | None = None
+    """原帖链接展示文本"""
+    _extra_info: str | None = None
+    """额外信息展示文本"""
+
+    def __post_init__(self) -> None:
+        # 构造时即按类型分桶, 渲染阶段各 *_contents 属性只做一次字典读取
+        # contents 仍保留原始顺序, 发送计划依赖图片与图文的交错顺序
+        self._bucket_contents()
+        self._init_display_fields()
+
+    def _init_display_fields(self) -> None:
+        """预先生成渲染用的展示文本, 渲染时直接读取"""
+        self._display_url = f"链接: {self.url}" if self.url else None
+        self._repost_display_url = (
+            f"原帖: {self.repost.url}" if self.repost and self.repost.url else None
+        )
+        self._extra_info = self.extra.get("info")
+
     @property
     def header(self) -> str | None:
         """头信息 仅用于 default render"""
@@ -181,39 +241,48 @@ class ParseResult:
 
     @property
     def display_url(self) -> str | None:
-        return f"链接: {self.url}" if self.url else None
+        return self._display_url
 
     @property
     def repost_display_url(self) -> str | None:
-        return f"原帖: {self.repost.url}" if self.repost and self.repost.url else None
+        return self._repost_display_url
 
     @property
     def extra_info(self) -> str | None:
-        return self.extra.get("info")
+        return self._extra_info
+
+    def _bucket_contents(self) -> dict[type[MediaContent], list[Any]]:
+        """单次遍历 contents, 按具体类型分桶并缓存"""
+        if self._buckets is None:
+            buckets: dict[type[MediaContent], list[Any]] = {}
+            for cont in self.contents:
+                buckets.setdefault(type(cont), []).append(cont)
+            self._buckets = buckets
+        return self._buckets
 
     @property
     def video_contents(self) -> list[VideoContent]:
-        return [cont for cont in self.contents if isinstance(cont, VideoContent)]
+        return self._bucket_contents().get(VideoContent, [])
 
     @property
     def img_contents(self) -> list[ImageContent]:
-        return [cont for cont in self.contents if isinstance(cont, ImageContent)]
+        return self._bucket_contents().get(ImageContent, [])
 
     @property
     def audio_contents(self) -> list[AudioContent]:
-        return [cont for cont in self.contents if isinstance(cont, AudioContent)]
+        return self._bucket_contents().get(AudioContent, [])
 
     @property
     def file_contents(self) -> list[FileContent]:
-        return [cont for cont in self.contents if isinstance(cont, FileContent)]
+        return self._bucket_contents().get(FileContent, [])
 
     @property
     def dynamic_contents(self) -> list[DynamicContent]:
-        return [cont for cont in self.contents if isinstance(cont, DynamicContent)]
+        return self._bucket_contents().get(DynamicContent, [])
 
     @property
     def graphics_contents(self) -> list[GraphicsContent]:
-        return [cont for cont in self.contents if isinstance(cont, GraphicsContent)]
+        return self._bucket_contents().get(GraphicsContent, [])
 
     @property
     async def cover_path(self) -> Path | None:
@@ -224,42 +293,47 @@ class ParseResult:
         return None
 
     @property
-    def formatted_datetime(self, fmt: str = "%Y-%m-%d %H:%M:%S") -> str | None:
+    def formatted_datetime(self) -> str | None:
         """格式化时间戳"""
-        return (
-            datetime.fromtimestamp(self.timestamp).strftime(fmt)
-            if self.timestamp is not None
-            else None
-        )
+        if self._formatted_dt is None and self.timestamp is not None:
+            self._formatted_dt = datetime.fromtimestamp(self.timestamp).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
+        return self._formatted_dt
 
     def __repr__(self) -> str:
-        return (
-            f"platform: {self.platform.display_name}, "
-            f"timestamp: {self.timestamp}, "
-            f"title: {self.title}, "
-            f"text: {self.text}, "
-            f"url: {self.url}, "
-            f"author: {self.author}, "
-            f"contents: {self.contents}, "
-            f"extra: {self.extra}, "
-            f"repost: <<<<<<<{self.repost}>>>>>>, "
+        parts = [
+            f"platform: {self.platform.display_name}",
+            f"timestamp: {self.timestamp}",
+            f"title: {self.title}",
+            f"text: {self.text}",
+            f"url: {self.url}",
+            f"author: {self.author}",
+            f"contents: {self.contents}",
+            f"extra: {self.extra}",
+        ]
+        # 仅在存在转发时递归, 避免为空转发拼接占位串
+        if self.repost is not None:
+            parts.append(f"repost: <<<<<<<{self.repost!r}>>>>>>")
+        parts.append(
             f"render_image: {self.render_image.name if self.render_image else 'None'}"
         )
+        return ", ".join(parts)
 
     def get_resource_id(self) -> str:
         """
         轻量、稳定、无 IO 的资源指纹
         用于判断是否为同一渲染输入
+        结果会被缓存, 修改字段后需先调用 invalidate_resource_id
         """
         if self._resource_id is not None:
             return self._resource_id
 
-        h = hashlib.blake2b(digest_size=8)
+        # 先收集所有字段, 最后一次性喂给哈希, 避免逐字段 update
+        parts: list[str] = []
 
         def add(v: object | None):
-            if v is not None:
-                h.update(str(v).encode("utf-8"))
-            h.update(b"|")
+            parts.append("" if v is None else str(v))
 
         add(self.platform.name)
         add(self.url)
@@ -268,28 +342,45 @@ class ParseResult:
             add(self.author.name)
 
         # ---------- 内容结构 ----------
-        add(len(self.contents))
-        for cont in self.contents:
-            add(cont.__class__.__name__)
-
-            # 子类补充（仍然是 O(1)）
-            if isinstance(cont, VideoContent):
-                add(cont.duration)
-            elif isinstance(cont, AudioContent):
-                add(cont.duration)
-            elif isinstance(cont, FileContent):
-                add(cont.name)
-            elif isinstance(cont, GraphicsContent):
-                add(cont.text)
-                add(cont.alt)
+        contents = self.contents
+        add(len(contents))
+        if len(contents) == 1:
+            # 单个视频/图片是最常见的情形, 免去循环开销
+            tp = type(contents[0])
+            add(tp.__name__)
+            for v in _RID_EXTRACTORS.get(tp, _rid_no_extra)(contents[0]):
+                add(v)
+        elif contents:
+            for cont in contents:
+                tp = type(cont)
+                add(tp.__name__)
+
+                # 子类补充（仍然是 O(1)）
+                for v in _RID_EXTRACTORS.get(tp, _rid_no_extra)(cont):
+                    add(v)
 
         # ---------- 转发 ----------
         if self.repost:
-            add(self.repost.get_resource_id())
+            add(self.repost._resource_id or self.repost.get_resource_id())
 
-        self._resource_id = h.hexdigest()
+        parts.append("")
+        h = _rid_hasher()
+        h.update("|".join(parts).encode("utf-8"))
+        self._resource_id = _rid_hexdigest(h)
         return self._resource_id
 
+    def invalidate_resource_id(self) -> None:
+        """
+        清除资源指纹、内容分桶及时间格式化缓存, 并重新生成展示文本 (含转发链)
+        构造后若修改了 contents、url、timestamp、extra 等字段, 需调用此方法
+        """
+        node: ParseResult | None = self
+        while node is not None:
+            node._resource_id = None
+            node._buckets = None
+            node._formatted_dt = None
+            node._init_display_fields()
+            node = node.repost
 
 
 class ParseResultKwargs(TypedDict, total=False):
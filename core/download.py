@@ -1,4 +1,13 @@
-from asyncio import Task, TimeoutError, create_task, gather, sleep, to_thread
+from asyncio import (
+    Task,
+    TimeoutError,
+    create_task,
+    current_task,
+    gather,
+    shield,
+    sleep,
+    to_thread,
+)
 from collections.abc import Callable, Coroutine
 from functools import wraps
 from pathlib import Path
@@ -74,6 +83,8 @@ class Downloader:
         self.headers: dict[str, str] = COMMON_HEADER.copy()
         # 视频信息缓存
         self.info_cache: LimitedSizeDict[str, VideoInfo] = LimitedSizeDict()
+        # 进行中的流式下载, 目标文件路径 -> 下载任务
+        self._inflight: dict[Path, Task[Path]] = {}
         # 用于流式下载的客户端
         self.client = ClientSession(
             timeout=ClientTimeout(total=config["download_timeout"])
@@ -106,10 +117,34 @@ class Downloader:
         if not file_name:
             file_name = generate_file_name(url)
         file_path = self.cache_dir / file_name
+        # 同一文件已在下载中, 直接等待该任务, 避免重复拉取
+        # 需先于 exists 判断, 下载中的文件虽已存在但尚未写完
+        if (pending := self._inflight.get(file_path)) is not None:
+            return await shield(pending)
         # 如果文件存在，则直接返回
         if file_path.exists():
             return file_path
 
+        task = current_task()
+        if task is not None:
+            self._inflight[file_path] = task
+        try:
+            return await self._stream_to_file(
+                url, file_path, ext_headers=ext_headers, proxy=proxy
+            )
+        finally:
+            self._inflight.pop(file_path, None)
+
+    async def _stream_to_file(
+        self,
+        url: str,
+        file_path: Path,
+        *,
+        ext_headers: dict[str, str] | None,
+        proxy: str | None | object,
+    ) -> Path:
+        """streamd 的实际下载逻辑, 带重试与大小限制"""
+        file_name = file_path.name
         headers = {**self.headers, **(ext_headers or {})}
 
         # Use sentinel value to detect if proxy was explicitly passed
@@ -36,15 +36,17 @@ _KEY_PATTERNS = "_key_patterns"
 
 
 # 注册处理器装饰器
-def handle(keyword: str, pattern: str):
-    """注册处理器装饰器"""
+def handle(keyword: str, pattern: str | Pattern[str]):
+    """注册处理器装饰器, pattern 可为字符串或已编译的正则"""
 
     def decorator(func: HandlerFunc[T]) -> HandlerFunc[T]:
         if not hasattr(func, _KEY_PATTERNS):
             setattr(func, _KEY_PATTERNS, [])
 
         key_patterns: KeyPatterns = getattr(func, _KEY_PATTERNS)
-        key_patterns.append((keyword, compile(pattern)))
+        key_patterns.append(
+            (keyword, pattern if isinstance(pattern, Pattern) else compile(pattern))
+        )
 
         return func
 
@@ -106,6 +108,9 @@ class BaseParser:
                 handler = cast(HandlerFunc, attr)
                 for keyword, pattern in key_patterns:
                     cls._handlers[keyword] = handler
+                    # 兼容直接设置的字符串正则, 保证 _key_patterns 中均为已编译对象
+                    if isinstance(pattern, str):
+                        pattern = compile(pattern)
                     cls._key_patterns.append((keyword, pattern))
 
         # 按关键字长度降序排序
@@ -1,9 +1,10 @@
-import json
 import re
+from http.cookies import SimpleCookie
 from pathlib import Path
 from typing import TYPE_CHECKING, ClassVar
 
 import msgspec
+from multidict import CIMultiDict
 
 from astrbot.api import logger
 from astrbot.core.config.astrbot_config import AstrBotConfig
@@ -15,20 +16,36 @@ from ..base import (
     Platform,
     handle,
 )
+from .slides import SlidesInfo
+from .video import RouterData
 
 if TYPE_CHECKING:
     from ...data import ParseResult
 
+_COOKIE_STRIP_TBL = str.maketrans("", "", "\r\n")
+
 
 class DouyinParser(BaseParser):
     # 平台信息
     platform: ClassVar[Platform] = Platform(name="douyin", display_name="抖音")
 
+    _ROUTER_DATA_MARK: ClassVar[bytes] = b"window._ROUTER_DATA"
+    """ 视频页面中 window._ROUTER_DATA 的定位标记 """
+    _ROUTER_DATA_DECODER: ClassVar[msgspec.json.Decoder[RouterData]] = msgspec.json.Decoder(RouterData)
+    """ RouterData 解码器, 类型结构只编译一次 """
+    _SLIDES_DECODER: ClassVar[msgspec.json.Decoder[SlidesInfo]] = msgspec.json.Decoder(SlidesInfo)
+    """ SlidesInfo 解码器, 类型结构只编译一次 """
+
     def __init__(self, config: AstrBotConfig, downloader: Downloader):
         super().__init__(config, downloader)
         self.douyin_ck = config.get("douyin_ck", "")
         self._cookies_file = Path(config["data_dir"]) / "douyin_cookies.json"
+        # 短链服务不支持 HEAD 时置为 True, 之后直接使用 GET
+        self._head_unsupported = False
         
+        # 预先转为 CIMultiDict, aiohttp 每次请求时无需再复制转换请求头
+        self.ios_headers = CIMultiDict(self.ios_headers)
+        self.android_headers = CIMultiDict(self.android_headers)
         self.ios_headers["Referer"] = "https://www.douyin.com/"
         self.android_headers["Referer"] = "https://www.douyin.com/"
         
@@ -38,7 +55,7 @@ class DouyinParser(BaseParser):
 
     def _clean_cookie(self, cookie: str) -> str:
         """清理cookie中的换行符和回车符"""
-        return cookie.replace("\n", "").replace("\r", "").strip()
+        return cookie.translate(_COOKIE_STRIP_TBL).strip()
 
     def _set_cookies(self, cookies: str):
         """设置cookie到请求头"""
@@ -53,7 +70,7 @@ class DouyinParser(BaseParser):
             return
 
         try:
-            cookies_data = json.loads(self._cookies_file.read_text())
+            cookies_data = msgspec.json.decode(self._cookies_file.read_bytes())
             self.douyin_ck = cookies_data.get("cookie", "")
             if self.douyin_ck:
                 self._set_cookies(self.douyin_ck)
@@ -64,41 +81,38 @@ class DouyinParser(BaseParser):
     def _save_cookies(self, cookies: str):
         """保存抖音 cookies 到文件"""
         try:
-            self._cookies_file.write_text(json.dumps({"cookie": cookies}, ensure_ascii=False))
+            self._cookies_file.write_bytes(msgspec.json.encode({"cookie": cookies}))
             logger.info(f"已保存抖音 cookies 到 {self._cookies_file}")
         except Exception as e:
             logger.warning(f"保存抖音 cookies 失败: {e}")
 
-    def _update_cookies_from_response(self, set_cookie_headers: list[str]):
-        """从响应的 Set-Cookie 头中更新 cookies"""
-        if not set_cookie_headers:
+    def _update_cookies_from_response(self, cookies: SimpleCookie):
+        """从响应已解析的 Set-Cookie 中更新 cookies"""
+        if not cookies:
             return
 
-        logger.debug(f"[抖音] 开始更新 cookies，收到 {len(set_cookie_headers)} 个 Set-Cookie")
+        logger.debug(f"[抖音] 开始更新 cookies，收到 {len(cookies)} 个 Set-Cookie")
 
         # 解析现有的 cookies
-        existing_cookies = {}
-        if self.douyin_ck:
-            for cookie in self.douyin_ck.split(";"):
-                cookie = cookie.strip()
-                if cookie and "=" in cookie:
-                    name, value = cookie.split("=", 1)
-                    existing_cookies[name.strip()] = value.strip()
-            logger.debug(f"[抖音] 现有 cookies 数量: {len(existing_cookies)}")
-
-        # 解析新的 cookies
-        new_cookie_names = []
-        for set_cookie in set_cookie_headers:
-            cookie_part = set_cookie.split(";")[0].strip()
-            if cookie_part and "=" in cookie_part:
-                name, value = cookie_part.split("=", 1)
-                existing_cookies[name.strip()] = value.strip()
-                new_cookie_names.append(name.strip())
-
-        logger.debug(f"[抖音] 新增/更新的 cookies: {new_cookie_names}")
+        existing_cookies = {
+            name.strip(): value.strip()
+            for name, value in (
+                c.split("=", 1) for c in self.douyin_ck.split(";") if "=" in c
+            )
+        }
+        logger.debug(f"[抖音] 现有 cookies 数量: {len(existing_cookies)}")
+
+        # 新的 cookies 由 aiohttp 以 SimpleCookie 解析, 已剥离属性
+        # 取 coded_value 保留原始编码 (含引号与转义), 回传服务器时逐字节一致
+        new_cookies_map = {
+            name: morsel.coded_value for name, morsel in cookies.items()
+        }
+        existing_cookies.update(new_cookies_map)
+
+        logger.debug(f"[抖音] 新增/更新的 cookies: {list(new_cookies_map)}")
 
         # 合并为 cookie 字符串
-        new_cookies = "; ".join([f"{k}={v}" for k, v in existing_cookies.items()])
+        new_cookies = "; ".join(map("=".join, existing_cookies.items()))
 
         if new_cookies != self.douyin_ck:
             self.douyin_ck = new_cookies
@@ -164,21 +178,35 @@ class DouyinParser(BaseParser):
         logger.debug(f"[抖音] 请求头 User-Agent: {headers.get('User-Agent', 'N/A')}")
         logger.debug(f"[抖音] 请求头 Cookie: {'已配置' if headers.get('Cookie') else '未配置'}")
 
-        async with self.client.get(
-            url, headers=headers, allow_redirects=False, ssl=False
-        ) as resp:
-            logger.debug(f"[抖音] 短链重定向响应状态码: {resp.status}")
-            # 从响应中提取 Set-Cookie 并更新
-            set_cookie_headers = resp.headers.getall("Set-Cookie", [])
-            if set_cookie_headers:
-                logger.debug(f"[抖音] 收到 {len(set_cookie_headers)} 个 Set-Cookie")
-                self._update_cookies_from_response(set_cookie_headers)
-
-            # 只有在状态码是重定向状态码时才获取 Location
-            redirect_url = url
-            if resp.status in (301, 302, 303, 307, 308):
-                redirect_url = resp.headers.get("Location", url)
-                logger.debug(f"[抖音] 重定向到: {redirect_url}")
+        # 只需要 Location 头, 优先使用 HEAD 以免下载响应体
+        redirect_codes = (301, 302, 303, 307, 308)
+        method = "GET" if self._head_unsupported else "HEAD"
+        head_failed = False
+        while True:
+            async with self.client.request(
+                method, url, headers=headers, allow_redirects=False, ssl=False
+            ) as resp:
+                logger.debug(f"[抖音] 短链重定向响应状态码: {resp.status}")
+                if method == "HEAD" and resp.status not in redirect_codes:
+                    # HEAD 未得到重定向, 用 GET 重试一次
+                    logger.debug("[抖音] 短链 HEAD 请求未重定向, 回退到 GET")
+                    head_failed = True
+                    method = "GET"
+                    continue
+                if head_failed and resp.status in redirect_codes:
+                    # GET 可以重定向而 HEAD 不行, 记住后直接使用 GET
+                    self._head_unsupported = True
+                # 从响应中提取 Set-Cookie 并更新
+                if resp.cookies:
+                    logger.debug(f"[抖音] 收到 {len(resp.cookies)} 个 Set-Cookie")
+                    self._update_cookies_from_response(resp.cookies)
+
+                # 只有在状态码是重定向状态码时才获取 Location
+                redirect_url = url
+                if resp.status in redirect_codes:
+                    redirect_url = resp.headers.get("Location", url)
+                    logger.debug(f"[抖音] 重定向到: {redirect_url}")
+            break
 
         if redirect_url == url:
             raise ParseException(f"无法重定向 URL: {url}")
@@ -186,6 +214,20 @@ class DouyinParser(BaseParser):
         keyword, searched = self.search_url(redirect_url)
         return await self.parse(keyword, searched)
 
+    @classmethod
+    def _extract_router_data(cls, body: bytes) -> bytes | None:
+        """直接在 HTML 字节中截取 window._ROUTER_DATA 的 JSON, 免去整页解码"""
+        start = body.find(cls._ROUTER_DATA_MARK)
+        if start < 0:
+            return None
+        start = body.find(b"=", start + len(cls._ROUTER_DATA_MARK))
+        if start < 0:
+            return None
+        end = body.find(b"</script>", start)
+        if end < 0:
+            return None
+        return body[start + 1 : end].strip()
+
     async def parse_video(self, url: str):
         logger.debug(f"[抖音] 视频页面请求: {url}")
         logger.debug(f"[抖音] 请求头 User-Agent: {self.ios_headers.get('User-Agent', 'N/A')}")
@@ -197,29 +239,22 @@ class DouyinParser(BaseParser):
             logger.debug(f"[抖音] 视频页面响应状态码: {resp.status}")
             if resp.status != 200:
                 raise ParseException(f"status: {resp.status}")
-            text = await resp.text()
-            logger.debug(f"[抖音] 响应体大小: {len(text)} 字符")
+            body = await resp.read()
+            logger.debug(f"[抖音] 响应体大小: {len(body)} 字节")
             # 从响应中提取 Set-Cookie 并更新
-            set_cookie_headers = resp.headers.getall("Set-Cookie", [])
-            if set_cookie_headers:
-                logger.debug(f"[抖音] 收到 {len(set_cookie_headers)} 个 Set-Cookie")
-                self._update_cookies_from_response(set_cookie_headers)
-
-        pattern = re.compile(
-            pattern=r"window\._ROUTER_DATA\s*=\s*(.*?)</script>",
-            flags=re.DOTALL,
-        )
-        matched = pattern.search(text)
+            if resp.cookies:
+                logger.debug(f"[抖音] 收到 {len(resp.cookies)} 个 Set-Cookie")
+                self._update_cookies_from_response(resp.cookies)
+
+        router_data = self._extract_router_data(body)
 
-        if not matched or not matched.group(1):
+        if not router_data:
             logger.debug("[抖音] 未在HTML中找到 window._ROUTER_DATA")
             raise ParseException("can't find _ROUTER_DATA in html")
 
         logger.debug("[抖音] 成功提取 window._ROUTER_DATA")
 
-        from .video import RouterData
-
-        video_data = msgspec.json.decode(matched.group(1).strip(), type=RouterData).video_data
+        video_data = self._ROUTER_DATA_DECODER.decode(router_data).video_data
         logger.debug(f"[抖音] 解析成功 - 作者: {video_data.author.nickname}, 描述: {video_data.desc[:50]}...")
         # 使用新的简洁构建方式
         contents = []
@@ -263,16 +298,13 @@ class DouyinParser(BaseParser):
             logger.debug(f"[抖音] 幻灯片API响应状态码: {resp.status}")
             resp.raise_for_status()
             # 从响应中提取 Set-Cookie 并更新
-            set_cookie_headers = resp.headers.getall("Set-Cookie", [])
-            if set_cookie_headers:
-                logger.debug(f"[抖音] 收到 {len(set_cookie_headers)} 个 Set-Cookie")
-                self._update_cookies_from_response(set_cookie_headers)
-
-            from .slides import SlidesInfo
+            if resp.cookies:
+                logger.debug(f"[抖音] 收到 {len(resp.cookies)} 个 Set-Cookie")
+                self._update_cookies_from_response(resp.cookies)
 
             response_text = await resp.read()
             logger.debug(f"[抖音] 幻灯片API响应体大小: {len(response_text)} 字节")
-            slides_data = msgspec.json.decode(response_text, type=SlidesInfo).aweme_details[0]
+            slides_data = self._SLIDES_DECODER.decode(response_text).aweme_details[0]
         logger.debug(f"[抖音] 幻灯片解析成功 - 作者: {slides_data.name}, 描述: {slides_data.desc[:50]}...")
         contents = []
 
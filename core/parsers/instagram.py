@@ -4,6 +4,7 @@ import html
 import json
 import re
 import sys
+import time
 from pathlib import Path
 from typing import Any, ClassVar
 from urllib.parse import urlparse
@@ -16,13 +17,43 @@ from astrbot.core.config.astrbot_config import AstrBotConfig
 from ..data import ImageContent, Platform, VideoContent
 from ..download import Downloader
 from ..exception import DownloadException, ParseException
-from ..utils import generate_file_name, safe_unlink, save_cookies_with_netscape
+from ..utils import (
+    LimitedSizeDict,
+    generate_file_name,
+    safe_unlink,
+    save_cookies_with_netscape,
+)
 from .base import BaseParser, handle
 
+# 有界字符集, 避免在每条消息上长时间回溯; ASCII 模式走 SRE 快速路径
+_IG_URL_TAIL = r"[\w.\-]{1,64}(?:[/?#][\w.?%&=+\-/#]{0,256})?"
+_IG_RE = re.compile(
+    r"https?://(?:www\.)?instagram\.com/(?:p|reel|reels|tv|share)/" + _IG_URL_TAIL,
+    re.ASCII,
+)
+_IGAM_RE = re.compile(
+    r"https?://(?:www\.)?instagr\.am/(?:p|reel|reels|tv)/" + _IG_URL_TAIL,
+    re.ASCII,
+)
+# 视频类帖子路径: reel / reels / tv
+_IG_VIDEO_PATH = re.compile(r"/(?:reels?|tv)/")
+# yt-dlp 参数模板, 调用时复制后再补充请求头、输出路径与 cookie
+_EXTRACT_OPTS_BASE: dict[str, Any] = {"quiet": True, "skip_download": True}
+_DOWNLOAD_OPTS_BASE: dict[str, Any] = {
+    "quiet": True,
+    "merge_output_format": "mp4",
+    "format": "best[height<=720]/bestvideo[height<=720]+bestaudio/best",
+}
+
 
 class InstagramParser(BaseParser):
     platform: ClassVar[Platform] = Platform(name="instagram", display_name="Instagram")
 
+    _FINAL_URL_TTL: ClassVar[float] = 300
+    """ 重定向结果缓存有效期, 单位: 秒 """
+    _YDL_POOL_SIZE: ClassVar[int] = 4
+    """ 空闲 YoutubeDL 实例的最大保留数 """
+
     def __init__(self, config: AstrBotConfig, downloader: Downloader):
         super().__init__(config, downloader)
         self.headers.update(
@@ -34,6 +65,19 @@ class InstagramParser(BaseParser):
         self.ig_cookies_file: Path | None = None
         self.ig_cookie_header: str | None = None
         self._set_cookies()
+        # cookies 只在初始化时写入, 文件是否存在只需检查一次
+        self._cookiefile_str: str | None = (
+            str(self.ig_cookies_file)
+            if self.ig_cookies_file and self.ig_cookies_file.is_file()
+            else None
+        )
+        # 仅用于 extract_info 的空闲 YoutubeDL 实例池, 初始化开销较大
+        # 实例非线程安全, 每次调用独占一个, 用完归还
+        self._ydl_pool: list[yt_dlp.YoutubeDL] = []
+        # 短链重定向结果缓存: url -> (解析时间, 最终 url)
+        self._final_url_cache: LimitedSizeDict[str, tuple[float, str]] = (
+            LimitedSizeDict(max_size=256)
+        )
 
     def _set_cookies(self) -> None:
         raw_cookies = (self.config.get("ig_ck") or "").strip()
@@ -116,8 +160,8 @@ class InstagramParser(BaseParser):
 
     async def _gallery_dl_image_urls(self, url: str) -> list[str]:
         cmd = [sys.executable, "-m", "gallery_dl", "-j"]
-        if self.ig_cookies_file and self.ig_cookies_file.is_file():
-            cmd += ["--cookies", str(self.ig_cookies_file)]
+        if self._cookiefile_str:
+            cmd += ["--cookies", self._cookiefile_str]
         cmd.append(url)
 
         process = await asyncio.create_subprocess_exec(
@@ -190,22 +234,26 @@ class InstagramParser(BaseParser):
         self, url: str, max_attempts: int = 3
     ) -> dict[str, Any] | None:
         opts = {
-            "quiet": True,
-            "skip_download": True,
+            **_EXTRACT_OPTS_BASE,
             "http_headers": {**self.headers, "Referer": "https://www.instagram.com/"},
         }
         if self.ig_cookie_header:
             opts["http_headers"]["Cookie"] = self.ig_cookie_header
-        if self.ig_cookies_file and self.ig_cookies_file.is_file():
-            opts["cookiefile"] = str(self.ig_cookies_file)
+        if self._cookiefile_str:
+            opts["cookiefile"] = self._cookiefile_str
         for attempt in range(1, max_attempts + 1):
+            ydl: yt_dlp.YoutubeDL | None = None
             try:
-                with yt_dlp.YoutubeDL(opts) as ydl:
-                    raw = await asyncio.to_thread(ydl.extract_info, url, download=False)
+                ydl = await self._acquire_extract_ydl(opts)
+                raw = await asyncio.to_thread(ydl.extract_info, url, download=False)
+                self._release_extract_ydl(ydl)
                 if isinstance(raw, dict):
                     return raw
                 return None
             except Exception as exc:
+                # 出错的实例状态不可信, 直接丢弃, 重试时换新实例
+                if ydl is not None:
+                    ydl.close()
                 logger.warning(
                     "Instagram yt-dlp extract_info error (%s/%s): %s",
                     attempt,
@@ -216,7 +264,38 @@ class InstagramParser(BaseParser):
                 await asyncio.sleep(min(2 * attempt, 5))
         return None
 
+    async def _resolve_final_url(self, url: str) -> str:
+        """获取重定向后的 URL, 短时间内重复的链接直接复用结果"""
+        now = time.monotonic()
+        cached = self._final_url_cache.get(url)
+        if cached and now - cached[0] < self._FINAL_URL_TTL:
+            return cached[1]
+        final_url = await self.get_final_url(url, headers=self.headers)
+        self._final_url_cache[url] = (now, final_url)
+        return final_url
+
+    async def _acquire_extract_ydl(self, opts: dict[str, Any]) -> yt_dlp.YoutubeDL:
+        """从池中取出一个空闲的 YoutubeDL 实例, 池空时新建
+
+        cookie 配置仅在初始化时确定, 池中实例的参数均与 opts 一致
+        """
+        if self._ydl_pool:
+            return self._ydl_pool.pop()
+        return await asyncio.to_thread(yt_dlp.YoutubeDL, opts)
+
+    def _release_extract_ydl(self, ydl: yt_dlp.YoutubeDL) -> None:
+        """归还正常完成调用的实例, 池满时直接关闭"""
+        if len(self._ydl_pool) < self._YDL_POOL_SIZE:
+            self._ydl_pool.append(ydl)
+        else:
+            ydl.close()
 
+    async def close_session(self) -> None:
+        """关闭会话并释放池中的 YoutubeDL 实例"""
+        await super().close_session()
+        for ydl in self._ydl_pool:
+            ydl.close()
+        self._ydl_pool.clear()
 
     async def _download_with_ytdlp(
         self, url: str, output_name: str | None = None
@@ -229,16 +308,14 @@ class InstagramParser(BaseParser):
             return output_path
         retries = 2
         opts: dict[str, Any] = {
-            "quiet": True,
+            **_DOWNLOAD_OPTS_BASE,
             "outtmpl": str(output_path),
-            "merge_output_format": "mp4",
-            "format": "best[height<=720]/bestvideo[height<=720]+bestaudio/best",
             "http_headers": {**self.headers, "Referer": "https://www.instagram.com/"},
         }
         if self.ig_cookie_header:
             opts["http_headers"]["Cookie"] = self.ig_cookie_header
-        if self.ig_cookies_file and self.ig_cookies_file.is_file():
-            opts["cookiefile"] = str(self.ig_cookies_file)
+        if self._cookiefile_str:
+            opts["cookiefile"] = self._cookiefile_str
         for attempt in range(retries + 1):
             try:
                 with yt_dlp.YoutubeDL(opts) as ydl:
@@ -309,103 +386,89 @@ class InstagramParser(BaseParser):
             return None
         return url
 
-    def _best_video_format(self, formats: list[dict[str, Any]]) -> dict[str, Any] | None:
-        candidates: list[dict[str, Any]] = []
-        for fmt in formats:
-            if not isinstance(fmt, dict):
-                continue
-            if self._format_url_with_protocol(fmt) is None:
-                continue
-            vcodec = fmt.get("vcodec")
-            acodec = fmt.get("acodec")
-            if self._codec_is_none(vcodec):
-                continue
-            if not self._codec_is_none(acodec):
-                continue
-            candidates.append(fmt)
-        if not candidates:
-            return None
+    @classmethod
+    def _direct_formats(cls, formats: list[Any]) -> list[dict[str, Any]]:
+        """过滤出可直接通过 http(s) 下载的格式"""
+        return [
+            fmt
+            for fmt in formats
+            if isinstance(fmt, dict) and cls._format_url_with_protocol(fmt) is not None
+        ]
 
-        def sort_key(fmt: dict[str, Any]) -> tuple[int, int, int]:
-            vcodec = fmt.get("vcodec") or ""
-            prefer_avc = 1 if isinstance(vcodec, str) and ("avc" in vcodec or "h264" in vcodec) else 0
-            height = fmt.get("height")
-            tbr = fmt.get("tbr")
-            return (
-                prefer_avc,
-                int(height) if isinstance(height, int) else 0,
-                int(tbr) if isinstance(tbr, (int, float)) else 0,
-            )
+    @staticmethod
+    def _video_sort_key(fmt: dict[str, Any]) -> tuple[int, int, int]:
+        vcodec = fmt.get("vcodec") or ""
+        height = fmt.get("height")
+        tbr = fmt.get("tbr")
+        return (
+            1 if isinstance(vcodec, str) and ("avc" in vcodec or "h264" in vcodec) else 0,
+            int(height) if isinstance(height, int) else 0,
+            int(tbr) if isinstance(tbr, (int, float)) else 0,
+        )
 
-        return max(candidates, key=sort_key)
+    @staticmethod
+    def _audio_sort_key(fmt: dict[str, Any]) -> tuple[int, int]:
+        abr = fmt.get("abr")
+        tbr = fmt.get("tbr")
+        return (
+            int(abr) if isinstance(abr, (int, float)) else 0,
+            int(tbr) if isinstance(tbr, (int, float)) else 0,
+        )
+
+    # 以下 _best_*_format 的 formats 须先经过 _direct_formats 过滤
 
     @classmethod
-    def _best_audio_format(
+    def _best_video_format(
         cls, formats: list[dict[str, Any]]
     ) -> dict[str, Any] | None:
-        candidates: list[dict[str, Any]] = []
-        for fmt in formats:
-            if not isinstance(fmt, dict):
-                continue
-            url = fmt.get("url")
-            if not isinstance(url, str) or not url:
-                continue
-            vcodec = fmt.get("vcodec")
-            acodec = fmt.get("acodec")
-            if cls._codec_is_none(acodec):
-                continue
-            if not cls._codec_is_none(vcodec):
-                continue
-            protocol = fmt.get("protocol")
-            if isinstance(protocol, str) and not protocol.startswith("http"):
-                continue
-            candidates.append(fmt)
-        if not candidates:
-            return None
-
-        def sort_key(fmt: dict[str, Any]) -> tuple[int, int]:
-            abr = fmt.get("abr")
-            tbr = fmt.get("tbr")
-            return (
-                int(abr) if isinstance(abr, (int, float)) else 0,
-                int(tbr) if isinstance(tbr, (int, float)) else 0,
-            )
-
-        return max(candidates, key=sort_key)
-
-    def _best_av_format(self, formats: list[dict[str, Any]]) -> dict[str, Any] | None:
-        candidates: list[dict[str, Any]] = []
-        for fmt in formats:
-            if not isinstance(fmt, dict):
-                continue
-            if self._format_url_with_protocol(fmt) is None:
-                continue
-            vcodec = fmt.get("vcodec")
-            acodec = fmt.get("acodec")
-            if self._codec_is_none(vcodec) or self._codec_is_none(acodec):
-                continue
-            candidates.append(fmt)
-        if not candidates:
-            return None
+        codec_is_none = cls._codec_is_none
+        return max(
+            (
+                fmt
+                for fmt in formats
+                if not codec_is_none(fmt.get("vcodec"))
+                and codec_is_none(fmt.get("acodec"))
+            ),
+            key=cls._video_sort_key,
+            default=None,
+        )
 
-        def sort_key(fmt: dict[str, Any]) -> tuple[int, int, int]:
-            vcodec = fmt.get("vcodec") or ""
-            prefer_avc = 1 if isinstance(vcodec, str) and ("avc" in vcodec or "h264" in vcodec) else 0
-            height = fmt.get("height")
-            tbr = fmt.get("tbr")
-            return (
-                prefer_avc,
-                int(height) if isinstance(height, int) else 0,
-                int(tbr) if isinstance(tbr, (int, float)) else 0,
-            )
+    @classmethod
+    def _best_audio_format(
+        cls, formats: list[dict[str, Any]]
+    ) -> dict[str, Any] | None:
+        codec_is_none = cls._codec_is_none
+        return max(
+            (
+                fmt
+                for fmt in formats
+                if not codec_is_none(fmt.get("acodec"))
+                and codec_is_none(fmt.get("vcodec"))
+            ),
+            key=cls._audio_sort_key,
+            default=None,
+        )
 
-        return max(candidates, key=sort_key)
+    @classmethod
+    def _best_av_format(cls, formats: list[dict[str, Any]]) -> dict[str, Any] | None:
+        codec_is_none = cls._codec_is_none
+        return max(
+            (
+                fmt
+                for fmt in formats
+                if not codec_is_none(fmt.get("vcodec"))
+                and not codec_is_none(fmt.get("acodec"))
+            ),
+            key=cls._video_sort_key,
+            default=None,
+        )
 
     def _select_media_urls(
         self, info: dict[str, Any]
     ) -> tuple[str | None, str | None]:
         formats = info.get("formats")
         if isinstance(formats, list) and formats:
+            formats = self._direct_formats(formats)
             video_fmt = self._best_video_format(formats)
             audio_fmt = self._best_audio_format(formats)
             if video_fmt and audio_fmt:
@@ -432,23 +495,26 @@ class InstagramParser(BaseParser):
         digest = hashlib.md5(f"{v_url}|{a_url}".encode()).hexdigest()[:16]
         return self.downloader.cache_dir / f"{digest}.mp4"
 
+    def _merged_video_task(self, v_url: str, a_url: str) -> Path | asyncio.Task[Path]:
+        """已合并过则直接返回路径, 否则返回已调度的下载合并任务 (绝不返回裸协程)"""
+        output_path = self._merged_output_path(v_url, a_url)
+        if output_path.exists():
+            return output_path
+        return self.downloader.download_av_and_merge(
+            v_url,
+            a_url,
+            output_path=output_path,
+            ext_headers=self.headers,
+            proxy=self.proxy,
+        )
+
 
-    @handle(
-        "instagram.com",
-        r"https?://(?:www\.)?instagram\.com/(?:p|reel|reels|tv|share)/[A-Za-z0-9._?%&=+\-/#]+",
-    )
-    @handle(
-        "instagr.am",
-        r"https?://(?:www\.)?instagr\.am/(?:p|reel|reels|tv)/[A-Za-z0-9._?%&=+\-/#]+",
-    )
+    @handle("instagram.com", _IG_RE)
+    @handle("instagr.am", _IGAM_RE)
     async def _parse(self, searched: re.Match[str]):
         url = searched.group(0)
-        final_url = await self.get_final_url(url, headers=self.headers)
-        if matched := re.search(r"/(p|reel|reels|tv)/", final_url):
-            kind = matched.group(1)
-        else:
-            kind = ""
-        is_video_url = kind in {"reel", "reels", "tv"}
+        final_url = await self._resolve_final_url(url)
+        is_video_url = _IG_VIDEO_PATH.search(final_url) is not None
         shortcode = self._extract_shortcode(final_url) or self._extract_shortcode(url)
         base_prefix = f"ig_{shortcode}" if shortcode else "ig"
         info = await self._fetch_ytdlp_info(final_url)
@@ -481,69 +547,78 @@ class InstagramParser(BaseParser):
         entries = self._iter_entries(info)
         single_entry = len(entries) == 1
 
+        # 单次解析内的媒体链接选择缓存, 以 dict 的 id 为键 (解析期间不会被修改)
+        # 单条目时 entry 即 info, 回退分支可直接复用已有结果
+        media_urls_cache: dict[int, tuple[str | None, str | None]] = {}
+
+        def select_media_urls(item: dict[str, Any]) -> tuple[str | None, str | None]:
+            key = id(item)
+            if key not in media_urls_cache:
+                media_urls_cache[key] = self._select_media_urls(item)
+            return media_urls_cache[key]
+
         meta_entry: dict[str, Any] | None = None
         fallback_video_tried = False
-        for idx, entry in enumerate(entries):
-            entry_id = self._entry_identity(entry, str(idx))
-            base_name = f"{base_prefix}_{entry_id}"
-            formats = entry.get("formats")
-            video_url, audio_url = self._select_media_urls(entry)
-            if not video_url and isinstance(formats, list) and formats:
-                video_fmt = self._best_av_format(formats)
-                if video_fmt:
-                    video_url = video_fmt.get("url")
-            duration = float(entry.get("duration") or 0)
-            if not video_url:
-                continue
-            if video_url:
-                cover_task = None
-                if audio_url:
-                    output_path = self._merged_output_path(video_url, audio_url)
-                    if output_path.exists():
-                        video_task = output_path
+        # yt-dlp 回退下载任务, 及需插入其结果的 (在 contents 中的位置, 时长)
+        ytdlp_task: asyncio.Task[Path] | None = None
+        ytdlp_slots: list[tuple[int, float]] = []
+        try:
+            for idx, entry in enumerate(entries):
+                entry_id = self._entry_identity(entry, str(idx))
+                base_name = f"{base_prefix}_{entry_id}"
+                formats = entry.get("formats")
+                video_url, audio_url = select_media_urls(entry)
+                if not video_url and isinstance(formats, list) and formats:
+                    video_fmt = self._best_av_format(self._direct_formats(formats))
+                    if video_fmt:
+                        video_url = video_fmt.get("url")
+                duration = float(entry.get("duration") or 0)
+                if not video_url:
+                    continue
+                if video_url:
+                    cover_task = None
+                    if audio_url:
+                        video_task = self._merged_video_task(video_url, audio_url)
+                        contents.append(VideoContent(video_task, cover_task, duration))
                     else:
-                        video_task = self.downloader.download_av_and_merge(
-                            video_url,
-                            audio_url,
-                            output_path=output_path,
-                            ext_headers=self.headers,
-                            proxy=self.proxy,
-                        )
-                    contents.append(VideoContent(video_task, cover_task, duration))
-                else:
-                    v_url, a_url = (None, None)
-                    if single_entry:
-                        v_url, a_url = self._select_media_urls(info)
-                    if a_url and v_url:
-                        output_path = self._merged_output_path(v_url, a_url)
-                        if output_path.exists():
-                            video_task = output_path
-                        else:
-                            video_task = self.downloader.download_av_and_merge(
-                                v_url,
-                                a_url,
-                                output_path=output_path,
-                                ext_headers=self.headers,
-                                proxy=self.proxy,
+                        v_url, a_url = (None, None)
+                        if single_entry:
+                            v_url, a_url = select_media_urls(info)
+                        if a_url and v_url:
+                            video_task = self._merged_video_task(v_url, a_url)
+                            contents.append(
+                                VideoContent(video_task, cover_task, duration)
                             )
-                        contents.append(VideoContent(video_task, cover_task, duration))
-                        if meta_entry is None:
-                            meta_entry = entry
-                        continue
+                            if meta_entry is None:
+                                meta_entry = entry
+                            continue
+
+                        fallback_video_tried = True
+                        # 回退下载的目标均为帖子链接, 只启动一次, 各条目共享结果
+                        if ytdlp_task is None:
+                            ytdlp_task = asyncio.create_task(
+                                self._download_with_ytdlp(
+                                    final_url, f"{base_name}_ydlp.mp4"
+                                )
+                            )
+                        # 记录插入位置, 循环结束后再等待, 不阻塞后续条目
+                        ytdlp_slots.append((len(contents), duration))
+                if meta_entry is None:
+                    meta_entry = entry
 
-                    fallback_video_tried = True
-                    try:
-                        video_task = await self._download_with_ytdlp(
-                            final_url, f"{base_name}_ydlp.mp4"
-                        )
-                        contents.append(VideoContent(video_task, cover_task, duration))
-                        if meta_entry is None:
-                            meta_entry = entry
-                        continue
-                    except ParseException:
-                        pass
-            if meta_entry is None:
-                meta_entry = entry
+            if ytdlp_task is not None:
+                try:
+                    video_path = await ytdlp_task
+                except ParseException:
+                    pass
+                else:
+                    # 倒序插入, 保持各条目在 contents 中的原有顺序
+                    for pos, duration in reversed(ytdlp_slots):
+                        contents.insert(pos, VideoContent(video_path, None, duration))
+        finally:
+            # 异常或取消退出时, 不再有人等待的下载任务一并取消
+            if ytdlp_task is not None and not ytdlp_task.done():
+                ytdlp_task.cancel()
 
         meta = meta_entry or info
         if not contents:
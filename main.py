@@ -2,7 +2,6 @@
 
 import asyncio
 import re
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from astrbot.api import logger
@@ -24,13 +23,22 @@ from .core.render import Renderer
 from .core.sender import MessageSender
 from .core.utils import extract_json_url
 
+try:
+    import ahocorasick
+except ImportError:  # 未安装 pyahocorasick 时回退到逐关键词扫描
+    ahocorasick = None
+
+
+def _maybe_int(value: int | str) -> int:
+    """aiocqhttp 上报的 id/时间通常已是 int, 仅在必要时转换"""
+    return value if type(value) is int else int(value)
+
 
 class ParserPlugin(Star):
     def __init__(self, context: Context, config: AstrBotConfig):
         super().__init__(context)
         self.context = context
         self.config = config
-        self._executor = ThreadPoolExecutor(max_workers=2)
 
         # 插件数据目录
         self.data_dir: Path = StarTools.get_data_dir("astrbot_plugin_parser")
@@ -40,13 +48,27 @@ class ParserPlugin(Star):
         self.cache_dir: Path = self.data_dir / "cache_dir"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         config["cache_dir"] = str(self.cache_dir)
-        self.config.save_config()
+
+        # 禁用的会话, 与配置中的列表保持同步, 用于 O(1) 判定
+        self._disabled_sessions: set[str] = set(config["disabled_sessions"])
+
+        # 串行化配置的修改与落盘, 避免多个线程同时写配置文件
+        self._config_lock = asyncio.Lock()
 
         # 关键词 -> Parser 映射
         self.parser_map: dict[str, BaseParser] = {}
 
-        # 关键词 -> 正则 列表
-        self.key_pattern_list: list[tuple[str, re.Pattern[str]]] = []
+        # 已创建的 Parser 实例, 每个平台一个
+        self._unique_parsers: list[BaseParser] = []
+
+        # 关键词、正则 两个平行元组, 下标一一对应, 已按长关键词优先排序
+        self._keywords: tuple[str, ...] = ()
+        self._patterns: tuple[re.Pattern[str], ...] = ()
+        # 正则是否必然以关键词开头, 是则可从关键词所在位置开始搜索
+        self._anchored: tuple[bool, ...] = ()
+
+        # 关键词自动机, 单次扫描即可找出消息中出现的全部关键词
+        self._ac = None
 
         # 渲染器
         self.renderer = Renderer(config)
@@ -68,6 +90,9 @@ class ParserPlugin(Star):
 
     async def initialize(self):
         """加载、重载插件时触发"""
+        # 持久化 __init__ 中写入的目录配置, 避免阻塞事件循环
+        async with self._config_lock:
+            await asyncio.to_thread(self.config.save_config)
         # 加载x渲染器资源
         await asyncio.to_thread(Renderer.load_resources)
         # 注册解析器
@@ -77,10 +102,8 @@ class ParserPlugin(Star):
         """插件卸载时触发"""
         # 关下载器里的会话
         await self.downloader.close()
-        # 关所有解析器里的会话 (去重后的实例)
-        unique_parsers = set(self.parser_map.values())
-        for parser in unique_parsers:
-            await parser.close_session()
+        # 并发关闭所有解析器里的会话
+        await asyncio.gather(*(p.close_session() for p in self._unique_parsers))
         # 关缓存清理器
         await self.cleaner.stop()
 
@@ -98,22 +121,63 @@ class ParserPlugin(Star):
         platform_names = []
         for _cls in enabled_classes:
             parser = _cls(self.config, self.downloader)
+            self._unique_parsers.append(parser)
             platform_names.append(parser.platform.display_name)
             for keyword, _ in _cls._key_patterns:
                 self.parser_map[keyword] = parser
         logger.info(f"启用平台: {'、'.join(platform_names)}")
 
-        # 关键词-正则对，一次性生成并排序
+        # 关键词-正则对，正则已在解析器类定义时编译，此处只需汇总并排序
         patterns: list[tuple[str, re.Pattern[str]]] = [
-            (kw, re.compile(pt) if isinstance(pt, str) else pt)
-            for cls in enabled_classes
-            for kw, pt in cls._key_patterns
+            (kw, pt) for cls in enabled_classes for kw, pt in cls._key_patterns
         ]
         # 长关键词优先
         patterns.sort(key=lambda x: -len(x[0]))
-        keywords = [kw for kw, _ in patterns]
+        keywords = tuple(kw for kw, _ in patterns)
         logger.debug(f"关键词-正则对已生成：{keywords}")
-        self.key_pattern_list = patterns
+        self._keywords = keywords
+        self._patterns = tuple(pt for _, pt in patterns)
+        self._anchored = tuple(
+            pt.pattern.startswith(re.escape(kw)) for kw, pt in patterns
+        )
+
+        # 无关键词时自动机无法构建, 保持 None 即视为无匹配
+        self._ac = None
+        if ahocorasick is not None and keywords:
+            # 关键词 -> 其在 _keywords 中的下标, 用于保持长关键词优先
+            indexes: dict[str, list[int]] = {}
+            for idx, kw in enumerate(keywords):
+                indexes.setdefault(kw, []).append(idx)
+            ac = ahocorasick.Automaton()
+            for kw, idx_list in indexes.items():
+                ac.add_word(kw, tuple(idx_list))
+            ac.make_automaton()
+            self._ac = ac
+
+    def _search_keyword(self, text: str) -> tuple[str, re.Match[str]] | None:
+        """关键词 + 正则双重判定, 返回首个命中的关键词及匹配结果"""
+        keywords, patterns, anchored = self._keywords, self._patterns, self._anchored
+        if self._ac is not None:
+            # 下标 -> 关键词首次出现的结束位置
+            hits: dict[int, int] = {}
+            for end, idxs in self._ac.iter(text):
+                for i in idxs:
+                    hits.setdefault(i, end)
+            for i in sorted(hits):
+                kw = keywords[i]
+                pos = hits[i] - len(kw) + 1 if anchored[i] else 0
+                if m := patterns[i].search(text, pos):
+                    return kw, m
+            return None
+
+        for i, kw in enumerate(keywords):
+            idx = text.find(kw)
+            if idx < 0:
+                continue
+            # 以关键词开头的正则, 其匹配必然起始于某次出现处, 跳过之前的部分
+            if m := patterns[i].search(text, idx if anchored[i] else 0):
+                return kw, m
+        return None
 
     def _get_parser_by_type(self, parser_type):
         for parser in self.parser_map.values():
@@ -127,7 +191,7 @@ class ParserPlugin(Star):
         umo = event.unified_msg_origin
 
         # 禁用会话
-        if umo in self.config["disabled_sessions"]:
+        if umo in self._disabled_sessions:
             return
 
         # 消息链
@@ -153,16 +217,10 @@ class ParserPlugin(Star):
             return
 
         # 核心匹配逻辑 ：关键词 + 正则双重判定，汇集了所有解析器的正则对。
-        keyword: str = ""
-        searched: re.Match[str] | None = None
-        for kw, pat in self.key_pattern_list:
-            if kw not in text:
-                continue
-            if m := pat.search(text):
-                keyword, searched = kw, m
-                break
-        if searched is None:
+        matched = self._search_keyword(text)
+        if matched is None:
             return
+        keyword, searched = matched
         logger.debug(f"匹配结果: {keyword}, {searched}")
 
         # 仲裁机制
@@ -174,9 +232,9 @@ class ParserPlugin(Star):
             is_win = await self.arbiter.compete(
                 bot=event.bot,
                 ctx=ArbiterContext(
-                    message_id=int(raw["message_id"]),
-                    msg_time=int(raw["time"]),
-                    self_id=int(raw["self_id"]),
+                    message_id=_maybe_int(raw["message_id"]),
+                    msg_time=_maybe_int(raw["time"]),
+                    self_id=_maybe_int(raw["self_id"]),
                 ),
             )
             if not is_win:
@@ -206,9 +264,12 @@ class ParserPlugin(Star):
     async def open_parser(self, event: AstrMessageEvent):
         """开启当前会话的解析"""
         umo = event.unified_msg_origin
-        if umo in self.config["disabled_sessions"]:
-            self.config["disabled_sessions"].remove(umo)
-            self.config.save_config()
+        if umo in self._disabled_sessions:
+            self._disabled_sessions.discard(umo)
+            # 持锁修改, 避免其他线程仍在序列化同一列表
+            async with self._config_lock:
+                self.config["disabled_sessions"].remove(umo)
+                await asyncio.to_thread(self.config.save_config)
             yield event.plain_result("解析已开启")
         else:
             yield event.plain_result("解析已开启，无需重复开启")
@@ -217,9 +278,11 @@ class ParserPlugin(Star):
     async def close_parser(self, event: AstrMessageEvent):
         """关闭当前会话的解析"""
         umo = event.unified_msg_origin
-        if umo not in self.config["disabled_sessions"]:
-            self.config["disabled_sessions"].append(umo)
-            self.config.save_config()
+        if umo not in self._disabled_sessions:
+            self._disabled_sessions.add(umo)
+            async with self._config_lock:
+                self.config["disabled_sessions"].append(umo)
+                await asyncio.to_thread(self.config.save_config)
             yield event.plain_result("解析已关闭")
         else:
             yield event.plain_result("解析已关闭，无需重复关闭")